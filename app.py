@@ -1,43 +1,167 @@
+import os
+
+# Keep each tesseract process single-threaded; parallelism comes from running
+# several of them at once (must be set before tesseract is invoked; an explicit
+# value from the environment wins)
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 import streamlit as st
 import pytesseract
-from pdf2image import convert_from_path
 from PIL import Image
-import google.generativeai as genai
-import os
 from dotenv import load_dotenv
 import tempfile
+import io
+import shutil
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from ocr_text import normalize_ocr_text
+from quiz_parser import format_quiz
 
 # Load Google API key from environment variable
 load_dotenv()  # Load environment variables from .env file
 
-# Configure Gemini with API key
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+# Poppler is installed at build time (Dockerfile / packages.txt), never at runtime
+POPPLER_AVAILABLE = shutil.which("pdftoppm") is not None
+
+# Resolution PDF pages are rendered at for OCR
+PDF_DPI = 150
+
+# Maximum number of PDF pages rendered and OCR'd together by one worker; keeps the
+# number of rasterized pages on disk bounded for long PDFs
+PDF_PAGES_PER_BATCH = 8
+
+# Longest side (in pixels) of the uploaded image preview shown in the browser
+PREVIEW_IMAGE_SIDE = 800
+
+# Tesseract settings for uploaded images: LSTM engine only, single uniform block of text
+IMAGE_OCR_CONFIG = "--oem 1 --psm 6"
+
+# Tesseract settings for PDF pages: LSTM engine only, so the legacy model is never loaded
+PDF_OCR_CONFIG = "--oem 1"
+
+# Longest image side (in pixels) passed to tesseract; larger uploads are downscaled
+MAX_OCR_IMAGE_SIDE = 2000
+
+# Function to extract text from image bytes using OCR (cached by file content)
+@st.cache_data(show_spinner=False, max_entries=32, ttl="1h")
+def extract_text_from_image(image_bytes):
+    image = Image.open(io.BytesIO(image_bytes)).convert("L")  # Tesseract works on grayscale
+    if max(image.size) > MAX_OCR_IMAGE_SIDE:
+        image.thumbnail((MAX_OCR_IMAGE_SIDE, MAX_OCR_IMAGE_SIDE), Image.LANCZOS)
+    text = pytesseract.image_to_string(image, config=IMAGE_OCR_CONFIG)
+    return normalize_ocr_text(text)
 
-# Function to extract text from images using OCR
-def extract_text_from_image(image):
-    text = pytesseract.image_to_string(image)
+# Function to get the maximum number of pages OCR'd in parallel, from the OCR_CONCURRENCY
+# environment variable (defaults to the number of CPUs); validated once per server process
+@st.cache_resource(show_spinner=False)
+def get_ocr_concurrency():
+    cpu_count = os.cpu_count() or 1
+    value = os.getenv("OCR_CONCURRENCY")
+    if value is None:
+        return cpu_count
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logging.getLogger(__name__).warning(
+            "Ignoring invalid OCR_CONCURRENCY=%r; using the CPU count (%d) instead", value, cpu_count
+        )
+        return cpu_count
+
+# Function to get the OCR worker pool, shared by all sessions so concurrent uploads
+# together never run more than get_ocr_concurrency() tesseract processes
+@st.cache_resource
+def get_ocr_executor():
+    return ThreadPoolExecutor(max_workers=get_ocr_concurrency(), thread_name_prefix="ocr")
+
+# Function to warm up tesseract once per server process, in the background on the OCR pool;
+# the first real upload then finds the binary and language data already loaded from disk
+@st.cache_resource(show_spinner=False)
+def warm_up_tesseract():
+    return get_ocr_executor().submit(
+        pytesseract.image_to_string, Image.new("L", (32, 32), 255), config=PDF_OCR_CONFIG
+    )
+
+# Function to rasterize a range of PDF pages to disk and OCR them with a single tesseract process
+def ocr_pdf_pages(pdf_path, first_page, last_page, output_folder):
+    from pdf2image import convert_from_path  # Imported lazily; image-only sessions never need it
+
+    page_paths = convert_from_path(
+        pdf_path,
+        first_page=first_page,
+        last_page=last_page,
+        output_folder=output_folder,
+        dpi=PDF_DPI,
+        grayscale=True,  # Tesseract works on grayscale; a third of the bytes of RGB
+        fmt="jpeg",
+        jpegopt={"quality": 85, "progressive": False, "optimize": False},  # Fast to encode, clean enough for OCR
+        paths_only=True,
+    )
+
+    # Tesseract reads a .txt input as a list of images, loading its model once for all of them
+    list_path = os.path.join(output_folder, f"pages_{first_page}-{last_page}.txt")
+    with open(list_path, "w") as list_file:
+        list_file.write("\n".join(page_paths))
+    text = pytesseract.image_to_string(list_path, config=PDF_OCR_CONFIG)
+
+    # Free the rendered pages as soon as they are OCR'd
+    for path in page_paths:
+        os.remove(path)
     return text
 
-# Function to extract text from PDF using OCR (page by page)
-def extract_text_from_pdf(pdf_file):
-    # Save the uploaded PDF to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_pdf:
-        temp_pdf.write(pdf_file.read())
-        temp_pdf_path = temp_pdf.name
+# Function to extract text from PDF bytes using OCR, page by page (cached on disk by file content)
+@st.cache_data(show_spinner=False, max_entries=256, persist="disk")
+def extract_text_from_pdf(pdf_bytes):
+    from pdf2image import pdfinfo_from_path  # Imported lazily; image-only sessions never need it
 
-    # Convert the PDF to images and perform OCR
-    images = convert_from_path(temp_pdf_path)
     text = ""
-    for img in images:
-        text += pytesseract.image_to_string(img)
-    
-    # Optionally, delete the temporary file after processing
-    os.remove(temp_pdf_path)
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Write the PDF once so every page worker can read it
+        pdf_path = os.path.join(work_dir, "upload.pdf")
+        with open(pdf_path, "wb") as pdf_file:
+            pdf_file.write(pdf_bytes)
 
-    return text
+        # Split the pages into contiguous batches spread across the workers, each no larger
+        # than PDF_PAGES_PER_BATCH; workers render and OCR batches concurrently, so only
+        # the batches in flight are on disk at any time (map keeps page order)
+        page_count = pdfinfo_from_path(pdf_path)["Pages"]
+        if page_count:
+            workers = min(get_ocr_concurrency(), page_count)
+            batch_size = min(-(-page_count // workers), PDF_PAGES_PER_BATCH)  # Ceiling division
+            batches = [
+                (first_page, min(first_page + batch_size - 1, page_count))
+                for first_page in range(1, page_count + 1, batch_size)
+            ]
+            text = "".join(get_ocr_executor().map(
+                lambda batch: ocr_pdf_pages(pdf_path, batch[0], batch[1], work_dir),
+                batches,
+            ))
+
+    return normalize_ocr_text(text)
+
+# Minimum amount of extracted text worth sending to Gemini
+MIN_QUIZ_TEXT_LENGTH = 50
+
+# Maximum number of characters of extracted text included in the prompt
+MAX_QUIZ_TEXT_LENGTH = 12000
+
+# Function to get the Gemini model, shared across reruns and sessions (treat as read-only)
+@st.cache_resource
+def get_gemini_model(name="gemini-1.5-flash"):
+    # Imported lazily: google.generativeai pulls in gRPC and protobuf, which slows cold starts
+    import google.generativeai as genai
+
+    # Configure Gemini with API key
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    return genai.GenerativeModel(name)
+
+# Function to use Gemini model for quiz generation (uncached; always asks for a fresh quiz)
+def request_quiz(text, num_questions=5):
+    # Skip the API call when OCR found too little text to build a quiz from
+    if not text or len(text.strip()) < MIN_QUIZ_TEXT_LENGTH:
+        return ""
+    text = text[:MAX_QUIZ_TEXT_LENGTH]
 
-# Function to use Gemini model for quiz generation
-def generate_quiz(text, num_questions=5):
     prompt = f"""
     Generate {num_questions} multiple-choice questions (MCQs) based on the following text. Each question should have 4 options and a correct answer.
 
@@ -54,37 +178,84 @@ def generate_quiz(text, num_questions=5):
 
     Continue for all {num_questions} questions.
     """
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    response = model.generate_content(prompt)
-    return response.text
-
-# Function to format quiz output with horizontal questions and vertical answers
-def format_quiz(quiz_text):
-    questions = quiz_text.split("\n\n")  # Split questions by double newlines
-    quiz_data = []
-    for i, question in enumerate(questions):
-        if question.strip() == "":
-            continue
-        lines = question.split("\n")
-        if len(lines) < 3:  # Skip incomplete questions
-            continue
-        question_text = lines[0].replace("- ", "")  # Remove the bullet point
-        options = lines[1:-1]  # Extract options
-        correct_answer = lines[-1].replace("Correct Answer: ", "")  # Extract correct answer
-
-        # Ensure there are exactly 4 options (pad with empty strings if necessary)
-        while len(options) < 4:
-            options.append("")  # Add empty options if fewer than 4 are provided
-
-        quiz_data.append({
-            "question": question_text,
-            "options": [opt.strip() for opt in options],
-            "correct_answer": correct_answer.strip()
-        })
-    return quiz_data
+    model = get_gemini_model()
+    response = model.generate_content(prompt, stream=True)
+
+    # List each question as soon as its block is complete; only the question text is
+    # shown since the raw stream contains the answers. The buffer is only re-parsed
+    # when a chunk adds a "Correct Answer:" line, i.e. at most once per question
+    answer_marker = "correct answer:"  # Compared case-insensitively, like format_quiz
+    progress = st.empty()
+    chunks = []
+    tail = ""  # End of the previous chunk, so a marker split across chunks is still seen
+    shown = 0
+    for chunk in response:
+        chunk_text = chunk.text
+        chunks.append(chunk_text)
+        if answer_marker in (tail + chunk_text).lower():
+            received = format_quiz("".join(chunks))[:num_questions]
+            if len(received) > shown:
+                shown = len(received)
+                progress.markdown(
+                    f"Received {shown} of {num_questions} questions...\n\n"
+                    + "\n".join(f"{i}. {q['question']}" for i, q in enumerate(received, 1))
+                )
+        tail = (tail + chunk_text)[-(len(answer_marker) - 1):]
+    progress.empty()
+    return "".join(chunks)
+
+# Function to generate a quiz, cached on disk by text and question count
+@st.cache_data(show_spinner=False, max_entries=256, persist="disk")
+def generate_quiz(text, num_questions=5):
+    return request_quiz(text, num_questions)
+
+# Function to render the quiz and score it; submitting reruns only this fragment,
+# not the upload column or OCR dispatch
+@st.fragment
+def quiz_fragment():
+    if "quiz_data" not in st.session_state:
+        return
+
+    # Read session state once; the loops below use these locals
+    quiz_data = st.session_state.quiz_data
+    correct_indices = st.session_state.correct_indices
+
+    st.markdown("### 📝 Answer the Quiz")
+    # Widgets inside a form don't rerun the script until the answers are submitted
+    with st.form("quiz_form"):
+        user_answers = []
+        for i, question_data in enumerate(quiz_data):
+            st.markdown(f"**Question {i+1}: {question_data['question']}**")
+            # The radio's value is the index of the chosen option, shown via format_func
+            options = question_data['options']
+            user_answer = st.radio(
+                f"Select an answer for Question {i+1}",
+                range(len(options)),
+                format_func=options.__getitem__,
+                key=f"question_{i}"
+            )
+            user_answers.append(user_answer)
+        submitted = st.form_submit_button("Submit Answers")
+
+    if submitted:
+        # Selected and correct answers are both option indices, so scoring is int comparison
+        is_correct = [answer == correct for answer, correct in zip(user_answers, correct_indices)]
+        correct_count = sum(is_correct)
+        results = []
+        for i, (correct, question_data) in enumerate(zip(is_correct, quiz_data)):
+            if correct:
+                results.append(f"✅ Question {i+1}: Correct!")
+            else:
+                results.append(f"❌ Question {i+1}: Incorrect. The correct answer was **{question_data['correct_answer']}**.")
+
+        st.markdown("### 📝 Quiz Results")
+        for result in results:
+            st.write(result)
+        st.write(f"**Total Score: {correct_count}/{len(quiz_data)}**")
 
 # Streamlit UI for the Quiz Generator Chatbot
 st.set_page_config(page_title="Quiz Generator", layout="wide")
+warm_up_tesseract()
 
 # Main Content
 st.title("📝 Quiz Generator")
@@ -100,15 +271,39 @@ with left_column:
 
     if uploaded_file is not None:
         file_type = uploaded_file.type
+        file_bytes = uploaded_file.getvalue()
+        file_fp = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+        is_new_file = file_fp != st.session_state.get("file_fp")
+
+        # Downscale the image preview once per upload, so reruns don't push the
+        # full-resolution bitmap to the browser again
+        if is_new_file:
+            preview = None
+            if file_type in ["image/jpeg", "image/png", "image/jpg"]:
+                preview = Image.open(io.BytesIO(file_bytes))
+                preview.thumbnail((PREVIEW_IMAGE_SIDE, PREVIEW_IMAGE_SIDE), Image.LANCZOS)
+            st.session_state.preview = preview
 
         # Display image if uploaded file is an image
-        if file_type in ["image/jpeg", "image/png", "image/jpg"]:
-            image = Image.open(uploaded_file)
-            st.image(image, caption="Uploaded Image", use_column_width=True)
-            text = extract_text_from_image(image)
+        preview = st.session_state.preview
+        if preview is not None:
+            st.image(preview, caption="Uploaded Image", use_column_width=True)
+
+        # Only run OCR when a different file is uploaded; reruns reuse the stored text
+        # (OCR always reads the full-resolution original)
+        if is_new_file:
+            if file_type in ["image/jpeg", "image/png", "image/jpg"]:
+                text = extract_text_from_image(file_bytes)
+
+            elif file_type == "application/pdf":
+                if not POPPLER_AVAILABLE:
+                    st.error("PDF support requires Poppler (pdftoppm), which is not installed.")
+                    st.stop()
+                text = extract_text_from_pdf(file_bytes)
 
-        elif file_type == "application/pdf":
-            text = extract_text_from_pdf(uploaded_file)
+            st.session_state.extracted_text = text
+            st.session_state.file_fp = file_fp
+        text = st.session_state.extracted_text
 
         # Show extracted text
         st.markdown("### 📝 Extracted Text")
@@ -120,45 +315,36 @@ with right_column:
         st.markdown("### 🎯 Generate Quiz")
         num_questions = st.slider("Number of questions", 1, 10, 5)
 
-        if st.button("Generate Quiz"):
+        generate_clicked = st.button("Generate Quiz")
+        new_questions_clicked = st.button("New Questions", help="Ask for a fresh set of questions instead of the cached quiz")
+
+        if generate_clicked or new_questions_clicked:
             with st.spinner("Generating quiz..."):
                 try:
-                    quiz = generate_quiz(text, num_questions)
-                    quiz_data = format_quiz(quiz)
-                    if not quiz_data:
+                    # New Questions skips the persisted cache, so one-off quizzes never reach the disk;
+                    # the result is kept in session_state like any other quiz
+                    if new_questions_clicked:
+                        quiz = request_quiz(text, num_questions)
+                    else:
+                        quiz = generate_quiz(text, num_questions)
+                    # Drop questions whose answer matches none of their options; they can't be scored
+                    parsed_quiz = format_quiz(quiz)
+                    quiz_data = [q for q in parsed_quiz if q['correct_index'] >= 0]
+                    skipped_count = len(parsed_quiz) - len(quiz_data)
+                    if not quiz:
+                        st.warning("Not enough text was extracted from the file to generate a quiz.")
+                    elif not quiz_data:
                         st.error("Failed to generate a valid quiz. Please try again.")
                     else:
                         st.session_state.quiz_data = quiz_data
+                        st.session_state.correct_indices = [q['correct_index'] for q in quiz_data]
                         st.success("Quiz generated successfully! Scroll down to answer the quiz.")
+                        if skipped_count:
+                            st.info(f"Skipped {skipped_count} question(s) whose correct answer didn't match any option.")
                 except Exception as e:
                     st.error(f"An error occurred: {e}")
 
-        if "quiz_data" in st.session_state:
-            st.markdown("### 📝 Answer the Quiz")
-            user_answers = []
-            for i, question_data in enumerate(st.session_state.quiz_data):
-                st.markdown(f"**Question {i+1}: {question_data['question']}**")
-                user_answer = st.radio(
-                    f"Select an answer for Question {i+1}",
-                    question_data['options'],
-                    key=f"question_{i}"
-                )
-                user_answers.append(user_answer)
-
-            if st.button("Submit Answers"):
-                correct_count = 0
-                results = []
-                for i, (user_answer, question_data) in enumerate(zip(user_answers, st.session_state.quiz_data)):
-                    if user_answer == question_data['correct_answer']:
-                        correct_count += 1
-                        results.append(f"✅ Question {i+1}: Correct!")
-                    else:
-                        results.append(f"❌ Question {i+1}: Incorrect. The correct answer was **{question_data['correct_answer']}**.")
-
-                st.markdown("### 📝 Quiz Results")
-                for result in results:
-                    st.write(result)
-                st.write(f"**Total Score: {correct_count}/{len(st.session_state.quiz_data)}**")
+        quiz_fragment()
     else:
         st.markdown("### 🎯 Generate Quiz")
         st.info("Please upload a file to generate a quiz.")
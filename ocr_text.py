@@ -0,0 +1,17 @@
+import re
+
+# Runs of spaces/tabs, spaces before a line break and runs of blank lines in OCR output,
+# collapsed by normalize_ocr_text
+HORIZONTAL_SPACE_RE = re.compile(r"[ \t\v]+")
+LINE_END_SPACE_RE = re.compile(r" \n")
+BLANK_LINES_RE = re.compile(r"\n(?:[ \t]*\n){2,}")
+
+# Function to tidy OCR output (page breaks, whitespace runs, blank lines) so the
+# prompt doesn't spend tokens on layout noise
+def normalize_ocr_text(text):
+    text = text.replace("\r", "")  # "\r\n" line endings become plain "\n"
+    text = text.replace("\x0c", "\n")  # Tesseract ends every page with a form feed
+    text = HORIZONTAL_SPACE_RE.sub(" ", text)
+    text = LINE_END_SPACE_RE.sub("\n", text)
+    text = BLANK_LINES_RE.sub("\n\n", text)
+    return text.strip()
@@ -0,0 +1,83 @@
+import re
+
+# Line classes in the generated quiz text, matched once per line by format_quiz; each may
+# be a markdown heading, bulleted or bold, and case is ignored
+# "Question N:" / "N." label that starts a question (the UI adds its own numbering)
+QUESTION_PREFIX_RE = re.compile(
+    r"^(?:#+\s*)?(?:[-*]\s+)?(?:\*\*)?(?:Question\s*\d+\s*[:.)]?|\d+\s*[:.)])(?:\*\*)?\s*", re.IGNORECASE
+)
+# "a)" / "(a)" / "a." .. "d)" option line
+OPTION_LINE_RE = re.compile(r"^(?:#+\s*)?(?:[-*]\s+)?(?:\*\*)?(\(?[a-d][).])(?:\*\*)?\s*", re.IGNORECASE)
+# "Correct Answer:" line that ends a question
+ANSWER_PREFIX_RE = re.compile(r"^(?:#+\s*)?(?:[-*]\s+)?(?:\*\*)?Correct Answer:(?:\*\*)?\s*", re.IGNORECASE)
+
+# "a)" / "(b)" / "c." / "d:" label at the start of an option or answer
+OPTION_LABEL_RE = re.compile(r"^\(?[a-dA-D][).:]\s*")
+
+# Answer that is only an option letter: "b", "B", "b)", "(b)", "b." or "b:" (never "A banana")
+ANSWER_LETTER_RE = re.compile(r"^\(?([a-dA-D])(?:[).:]|\)?$)")
+
+# Function to reduce an option or answer to its comparable text: no label, markdown bold,
+# surrounding whitespace, trailing punctuation or case
+def answer_text_key(text):
+    text = OPTION_LABEL_RE.sub("", text.strip().strip("*").strip())
+    return text.strip().rstrip(".,;:!?").strip().casefold()
+
+# Function to find the index of the correct option (-1 if unknown): by exact text, then by
+# option text without its label, then by a bare option letter
+def find_correct_index(options, correct_answer):
+    if correct_answer and correct_answer in options:
+        return options.index(correct_answer)
+
+    answer_key = answer_text_key(correct_answer)
+    if answer_key:
+        for index, option in enumerate(options):
+            if option and answer_text_key(option) == answer_key:
+                return index
+
+    letter_match = ANSWER_LETTER_RE.match(correct_answer.strip().strip("*").strip())
+    if letter_match:
+        index = ord(letter_match.group(1).lower()) - ord("a")
+        if index < len(options) and options[index]:  # Never an empty padded slot
+            return index
+    return -1
+
+# Function to format quiz output with horizontal questions and vertical answers
+def format_quiz(quiz_text):
+    # Single pass over the lines: a question label starts a question, option lines
+    # accumulate and the "Correct Answer:" line completes it, whether or not the
+    # questions are separated by blank lines
+    quiz_data = []
+    question_text = None
+    options = [""] * 4  # Exactly 4 option slots; missing options stay empty
+    option_count = 0
+    for line in quiz_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        answer_match = ANSWER_PREFIX_RE.match(line)
+        if answer_match:
+            if question_text is not None and option_count:  # Skip incomplete questions
+                correct_answer = line[answer_match.end():]
+                quiz_data.append({
+                    "question": question_text,
+                    "options": options,
+                    "correct_answer": correct_answer,
+                    "correct_index": find_correct_index(options, correct_answer)
+                })
+            question_text = None
+            continue
+
+        question_match = QUESTION_PREFIX_RE.match(line)
+        if question_match:
+            question_text = line[question_match.end():].removesuffix("**").strip()  # "**Question 1: Text?**"
+            options = [""] * 4
+            option_count = 0
+        elif question_text is not None and option_count < 4:
+            option_match = OPTION_LINE_RE.match(line)
+            if option_match:
+                # Keep a plain "a) text" label, without bullet or bold markers
+                options[option_count] = f"{option_match.group(1)} {line[option_match.end():]}"
+                option_count += 1
+    return quiz_data
@@ -0,0 +1,21 @@
+from ocr_text import normalize_ocr_text
+
+
+def test_crlf_line_endings():
+    assert normalize_ocr_text("a   b\r\n\n\n\nc") == "a b\n\nc"
+    assert normalize_ocr_text("line one\r\nline two\r\n") == "line one\nline two"
+
+
+def test_form_feeds_become_line_breaks():
+    assert normalize_ocr_text("page one\x0cpage two\x0c") == "page one\npage two"
+
+
+def test_whitespace_runs():
+    assert normalize_ocr_text("  a \t\t b\v c  ") == "a b c"
+    assert normalize_ocr_text("trailing   \nnext") == "trailing\nnext"
+
+
+def test_blank_line_collapsing():
+    assert normalize_ocr_text("a\n\nb") == "a\n\nb"
+    assert normalize_ocr_text("a\n\n\n\nb") == "a\n\nb"
+    assert normalize_ocr_text("a\n \n\t\n  \nb") == "a\n\nb"
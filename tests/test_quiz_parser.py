@@ -0,0 +1,143 @@
+from quiz_parser import find_correct_index, format_quiz
+
+
+def test_plain_format():
+    quiz = format_quiz(
+        "- Question 1: Capital of France?\n"
+        "  a) London\n"
+        "  b) Paris\n"
+        "  c) Rome\n"
+        "  d) Berlin\n"
+        "  Correct Answer: b) Paris\n"
+    )
+    assert quiz == [{
+        "question": "Capital of France?",
+        "options": ["a) London", "b) Paris", "c) Rome", "d) Berlin"],
+        "correct_answer": "b) Paris",
+        "correct_index": 1,
+    }]
+
+
+def test_bulleted_options():
+    quiz = format_quiz(
+        "- Question 1: Capital of France?\n"
+        "- a) London\n"
+        "- b) Paris\n"
+        "- c) Rome\n"
+        "- d) Berlin\n"
+        "- Correct Answer: b) Paris\n"
+    )
+    assert len(quiz) == 1
+    assert quiz[0]["options"] == ["a) London", "b) Paris", "c) Rome", "d) Berlin"]
+    assert quiz[0]["correct_index"] == 1
+
+
+def test_bold_options():
+    quiz = format_quiz(
+        "**Question 1:** Capital of France?\n"
+        "**a)** London\n"
+        "**b)** Paris\n"
+        "**c)** Rome\n"
+        "**d)** Berlin\n"
+        "**Correct Answer:** b) Paris\n"
+    )
+    assert len(quiz) == 1
+    assert quiz[0]["question"] == "Capital of France?"
+    assert quiz[0]["options"] == ["a) London", "b) Paris", "c) Rome", "d) Berlin"]
+    assert quiz[0]["correct_index"] == 1
+
+
+def test_questions_without_blank_lines_and_missing_options():
+    quiz = format_quiz(
+        "Question 1: Two plus two?\n"
+        "a) 3\n"
+        "b) 4\n"
+        "Correct Answer: b) 4\n"
+        "Question 2: No options here\n"
+        "Correct Answer: a\n"
+    )
+    assert len(quiz) == 1
+    assert quiz[0]["options"] == ["a) 3", "b) 4", "", ""]
+
+
+def test_correct_index_from_answer_text():
+    options = ["a) Apples", "b) A banana", "c) Cherries", "d) Dates"]
+    assert find_correct_index(options, "A banana") == 1
+    assert find_correct_index(options, "a banana.") == 1
+    assert find_correct_index(options, "  Cherries ") == 2
+    assert find_correct_index(options, "b. A banana") == 1
+
+
+def test_correct_index_from_answer_text_without_label_match():
+    options = ["a) Shark", "b) Whale", "c) Salmon", "d) Tuna"]
+    assert find_correct_index(options, "Whale") == 1
+    assert find_correct_index(options, "**Whale**") == 1
+
+
+def test_correct_index_from_bare_letter():
+    options = ["a) Apples", "b) A banana", "c) Cherries", "d) Dates"]
+    assert find_correct_index(options, "c") == 2
+    assert find_correct_index(options, "C") == 2
+    assert find_correct_index(options, "(d)") == 3
+    assert find_correct_index(options, "b)") == 1
+    assert find_correct_index(options, "**a.**") == 0
+
+
+def test_correct_index_unknown():
+    options = ["a) Apples", "b) A banana", "", ""]
+    assert find_correct_index(options, "A kiwi") == -1
+    assert find_correct_index(options, "") == -1
+
+
+def test_bold_question_line():
+    quiz = format_quiz(
+        "**Question 1: Capital of France?**\n"
+        "a) London\n"
+        "b) Paris\n"
+        "Correct Answer: b) Paris\n"
+    )
+    assert len(quiz) == 1
+    assert quiz[0]["question"] == "Capital of France?"
+
+
+def test_heading_question_line():
+    quiz = format_quiz(
+        "### Question 1: Capital of France?\n"
+        "a) London\n"
+        "b) Paris\n"
+        "Correct Answer: b) Paris\n"
+    )
+    assert len(quiz) == 1
+    assert quiz[0]["question"] == "Capital of France?"
+
+
+def test_answer_line_is_case_insensitive():
+    quiz = format_quiz(
+        "Question 1: Two plus two?\n"
+        "a) 4\n"
+        "b) 3\n"
+        "Correct answer: a\n"
+    )
+    assert len(quiz) == 1
+    assert quiz[0]["correct_index"] == 0
+
+
+def test_parenthesized_option_labels():
+    quiz = format_quiz(
+        "Question 1: Two plus two?\n"
+        "(a) 3\n"
+        "(b) 4\n"
+        "(c) 5\n"
+        "(d) 6\n"
+        "Correct Answer: (b)\n"
+    )
+    assert len(quiz) == 1
+    assert quiz[0]["options"] == ["(a) 3", "(b) 4", "(c) 5", "(d) 6"]
+    assert quiz[0]["correct_index"] == 1
+
+
+def test_correct_index_letter_for_padded_slot():
+    options = ["a) x", "b) y", "", ""]
+    assert find_correct_index(options, "d") == -1
+    assert find_correct_index(options, "c)") == -1
+    assert find_correct_index(options, "b") == 1